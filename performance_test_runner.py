@@ -1,17 +1,69 @@
-import requests
+import asyncio
+import httpx
+import numpy as np
 import time
 import random
 import yaml
 import json
 import os
 import argparse
+import functools
+import html
+import importlib.util
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Any, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 import re
+import string
+
+# Use PyYAML's libyaml-backed C loader when available; it parses much faster
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# HTTP/2 support in httpx needs the optional 'h2' package (pip install httpx[http2]);
+# httpx imports it itself, so only check that it is installed
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# uvloop (optional) replaces the stock asyncio event loop with one built on libuv
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# orjson (optional) encodes and decodes JSON much faster than the stdlib module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dump_json(data: Any) -> bytes:
+    """Serialize data to compact JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+@functools.lru_cache(maxsize=256)
+def _load_payload_file(file_path: str, mtime: float) -> Any:
+    """Load a request payload file; mtime is part of the cache key so edits are picked up."""
+    if file_path.endswith('.json'):
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+    with open(file_path, 'r') as f:
+        return f.read()
+
+# Patterns for dynamic values and ${var_name} references, compiled once per process
+_RANDOM_RE = re.compile(r'\$random\{([^}]+)\}')
+_LOREM_RE = re.compile(r'\$lorem\{(\d+)\}')
+_TYPE_RE = re.compile(r'\$(\w+)\{([^}]*)\}')
+_VAR_RE = re.compile(r'\${([^}]+)}')
 
 class ValueProviderType(Enum):
     STATIC = "static"
@@ -36,9 +88,14 @@ class ValueProvider:
         """Get a provider function based on the value pattern"""
         if not isinstance(value, str):
             return lambda: value
-            
+        return ValueProvider._provider_for(value)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _provider_for(value: str) -> Callable[[], Any]:
+        """Build the provider for a template string, parsing each distinct template only once"""
         # Check for $random{...} pattern
-        random_match = re.match(r'\$random\{([^}]+)\}', value)
+        random_match = _RANDOM_RE.match(value)
         if random_match:
             choices = [x.strip() for x in random_match.group(1).split(',')]
             if len(choices) == 2 and all(x.strip().lstrip('-').replace('.', '', 1).isdigit() for x in choices):
@@ -62,13 +119,13 @@ class ValueProvider:
             return lambda: datetime.now(timezone.utc).isoformat()
             
         # Check for $lorem{N}
-        lorem_match = re.match(r'\$lorem\{(\d+)\}', value)
+        lorem_match = _LOREM_RE.match(value)
         if lorem_match:
             word_count = int(lorem_match.group(1))
             return lambda: ' '.join(['lorem'] * word_count)  # Simplified for example
             
         # Check for $random{type} patterns
-        type_match = re.match(r'\$(\w+)\{([^}]*)\}', value)
+        type_match = _TYPE_RE.match(value)
         if type_match:
             provider_type = type_match.group(1)
             params = type_match.group(2)
@@ -89,322 +146,637 @@ class ValueProvider:
         # No provider found, return as-is
         return lambda: value
 
-@dataclass
+@dataclass(slots=True)
 class TestConfig:
     base_url: str
     endpoints: List[Dict[str, Any]]
     num_workers: int = 10
     requests_per_endpoint: int = 100
     num_test_runs: int = 5
+    num_processes: int = 1
     default_headers: Dict[str, str] = field(default_factory=dict)
     variables: Dict[str, Any] = field(default_factory=dict)
     generators: Dict[str, Any] = field(default_factory=dict)
     datasets: Dict[str, Any] = field(default_factory=dict)
     ranges: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     endpoint: str
     method: str
     success: bool
     status_code: Optional[int]
     response_time: float  # in milliseconds
-    error: Optional[str] = None
+    error: Optional[str] = None  # truncated and HTML-escaped
     request_data: Optional[Dict] = None
 
+@dataclass(slots=True)
+class EndpointRun:
+    """The request builder of one endpoint and the results collected for it in a test run."""
+    method: str
+    url: str
+    build_request: Callable[[], Tuple[httpx.Request, Any]]  # Returns (request, request_data)
+    times: np.ndarray  # in nanoseconds
+    ok: np.ndarray
+    failures: List[TestResult] = field(default_factory=list)
+    
+    def record(self, i: int, result: Tuple[bool, Optional[int], int, Optional[str]], request_data: Any = None) -> None:
+        """Store the result of the i-th request sent to this endpoint."""
+        success, status_code, response_time_ns, error = result
+        self.times[i] = response_time_ns
+        self.ok[i] = success
+        if not success:
+            # Truncate and escape the message once here so reports only
+            # assemble ready-made HTML
+            if error is not None:
+                if len(error) > 100:
+                    error = error[:100] + '...'
+                error = html.escape(error, quote=False)
+            self.failures.append(TestResult(
+                endpoint=self.url,
+                method=self.method,
+                success=False,
+                status_code=status_code,
+                response_time=response_time_ns / 1e6,  # Convert to ms
+                error=error,
+                request_data=request_data
+            ))
+
+@dataclass(slots=True)
+class RunningStats:
+    """Fixed-size, mergeable summary of response times: count, sum, min, max and a histogram."""
+    # Each bucket is 1% wider than the previous one, so percentiles are accurate
+    # to about 1%; buckets span 1 µs to roughly 20 minutes and times outside
+    # land in the end buckets
+    MIN_NS = 1_000
+    GROWTH = 1.01
+    NUM_BUCKETS = 2100
+    
+    count: int = 0
+    total_ns: int = 0
+    min_ns: int = 0
+    max_ns: int = 0
+    buckets: np.ndarray = field(default_factory=lambda: np.zeros(RunningStats.NUM_BUCKETS, dtype=np.int64))
+    
+    def add_many(self, times_ns: np.ndarray) -> None:
+        """Add an array of response times in nanoseconds."""
+        if times_ns.size == 0:
+            return
+        low, high = int(times_ns.min()), int(times_ns.max())
+        self.min_ns = low if self.count == 0 else min(self.min_ns, low)
+        self.max_ns = high if self.count == 0 else max(self.max_ns, high)
+        self.count += int(times_ns.size)
+        self.total_ns += int(times_ns.sum())
+        
+        index = np.log(np.maximum(times_ns, self.MIN_NS) / self.MIN_NS) / np.log(self.GROWTH)
+        index = np.minimum(index.astype(np.int64), self.NUM_BUCKETS - 1)
+        self.buckets += np.bincount(index, minlength=self.NUM_BUCKETS)
+    
+    def merge(self, other: 'RunningStats') -> None:
+        """Fold another summary into this one."""
+        if other.count == 0:
+            return
+        self.min_ns = other.min_ns if self.count == 0 else min(self.min_ns, other.min_ns)
+        self.max_ns = other.max_ns if self.count == 0 else max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.buckets += other.buckets
+    
+    def percentile_ns(self, q: float) -> float:
+        """Estimate the q-th quantile (0..1) from the histogram."""
+        rank = max(1, int(np.ceil(q * self.count)))
+        bucket = int(np.searchsorted(np.cumsum(self.buckets), rank))
+        estimate = self.MIN_NS * self.GROWTH ** (bucket + 0.5)  # Geometric middle of the bucket
+        return min(max(estimate, self.min_ns), self.max_ns)
+    
+    def summary(self) -> Dict[str, float]:
+        """Return min/max/average and p50/p95/p99 response times in ms."""
+        if self.count == 0:
+            return {'min_time': 0, 'max_time': 0, 'avg_time': 0, 'p50_time': 0, 'p95_time': 0, 'p99_time': 0}
+        return {
+            'min_time': self.min_ns / 1e6,
+            'max_time': self.max_ns / 1e6,
+            'avg_time': self.total_ns / self.count / 1e6,
+            'p50_time': self.percentile_ns(0.5) / 1e6,
+            'p95_time': self.percentile_ns(0.95) / 1e6,
+            'p99_time': self.percentile_ns(0.99) / 1e6
+        }
+
 class PerformanceTester:
-    def __init__(self, config_path: str):
-        self.config = self._load_config(config_path)
-        self.session = requests.Session()
+    def __init__(self, config_path: str, **config_overrides: Any):
+        self.config = self._load_config(config_path, **config_overrides)
+        self.client: Optional[httpx.AsyncClient] = None
+        self._base = self.config.base_url.rstrip('/') + '/'
+        
+        # Variable lookups check one merged dict; variables take precedence
+        # over generators, then datasets, then ranges
+        self._lookup = {
+            **self.config.ranges,
+            **self.config.datasets,
+            **self.config.generators,
+            **self.config.variables
+        }
         
-        # Set default headers for all requests
-        if self.config.default_headers:
-            self.session.headers.update(self.config.default_headers)
+        # Method, URL and the data template never change between runs, so
+        # derive and compile them once per endpoint
+        self._endpoint_plans: Dict[int, Union[Tuple[str, str, bool, Callable[[], Any]], Exception]] = {}
+        for endpoint in self.config.endpoints:
+            # Keep the error of an invalid endpoint to report when it is run,
+            # so the other endpoints are still tested
+            try:
+                self._endpoint_plans[id(endpoint)] = (
+                    endpoint.get('method', 'GET').upper(),
+                    self._generate_url(endpoint['path']),
+                    *self._compile_request_data(endpoint)
+                )
+            except Exception as e:
+                self._endpoint_plans[id(endpoint)] = e
+        
+        # One event loop for the tester's lifetime lets the client and its
+        # warm connections be reused by every test run
+        self._loop = asyncio.new_event_loop()
+        
+        # With several processes, endpoints are sharded across worker processes
+        # that each run their own tester, so load generation is not limited
+        # to the one core the GIL allows; num_workers is split between them.
+        # There are never more shards than endpoints or workers to spread
+        self._num_shards = min(self.config.num_processes, len(self.config.endpoints), self.config.num_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if self._num_shards > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._num_shards,
+                initializer=_init_worker,
+                initargs=(config_path,)
+            )
     
-    def _load_config(self, config_path: str) -> TestConfig:
-        """Load test configuration from YAML file."""
+    def close(self) -> None:
+        """Close the worker processes, HTTP client and event loop shared by all test runs."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.client is not None:
+            self._loop.run_until_complete(self.client.aclose())
+            self.client = None
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.close()
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the HTTP client shared by all endpoints and test runs."""
+        # Size the pool so every worker keeps a warm connection; an undersized
+        # keep-alive pool drops sockets and pays a new TCP/TLS handshake each time
+        pool_size = max(self.config.num_workers, 32)
+        return httpx.AsyncClient(
+            # With HTTP/2, concurrent requests to the host share one connection
+            http2=HTTP2_AVAILABLE,
+            headers=self.config.default_headers,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=30.0
+            ),
+            # No timeouts, matching the previous behaviour of waiting for slow
+            # endpoints; this also makes requests wait for a free pooled
+            # connection instead of failing when the pool is exhausted
+            timeout=None,
+            # requests.Session followed redirects; httpx does not by default
+            follow_redirects=True
+        )
+    
+    def _load_config(self, config_path: str, **overrides: Any) -> TestConfig:
+        """Load test configuration from YAML file, replacing any overridden settings."""
         with open(config_path, 'r') as f:
-            config_data = yaml.safe_load(f)
+            config_data = yaml.load(f, Loader=SafeLoader)
+        config_data.update(overrides)
         return TestConfig(**config_data)
     
-    def _resolve_variables(self, value: Any) -> Any:
-        """Resolve variables and dynamic values in the configuration."""
+    def _substitute_variables(self, value: str) -> str:
+        """Substitute ${var_name} references with values from the configuration."""
+        return _VAR_RE.sub(self._lookup_variable, value)
+    
+    def _lookup_variable(self, match: re.Match) -> str:
+        """Return the configured value for a ${var_name} match."""
+        return str(self._lookup.get(match.group(1), match.group(0)))  # Not found, keep as is
+    
+    def _compile_template(self, value: Any) -> Tuple[bool, Callable[[], Any]]:
+        """Compile a data template into an (is_static, render) pair."""
+        # Variables are substituted here, and subtrees without dynamic values
+        # are built once and shared by every render; rendered data is only
+        # serialized, never modified
         if isinstance(value, str):
-            # Handle dynamic value providers
-            if value.startswith('$'):
+            # Handle dynamic value providers; a string that starts with a
+            # ${var_name} reference is a static variable substitution instead
+            if value.startswith('$') and not _VAR_RE.match(value):
                 provider = ValueProvider.get_provider(value)
-                return provider()
-                
-            # Handle variable substitution ${var_name}
-            var_match = re.findall(r'\${([^}]+)}', value)
-            if var_match:
-                result = value
-                for var_name in var_match:
-                    # Check in different sections of config
-                    var_value = (
-                        self.config.variables.get(var_name) or
-                        self.config.generators.get(var_name) or
-                        self.config.datasets.get(var_name) or
-                        self.config.ranges.get(var_name) or
-                        f'${{{var_name}}}'  # Not found, keep as is
-                    )
-                    result = result.replace(f'${{{var_name}}}', str(var_value))
-                return result
-                
+                return False, provider
+            value = self._substitute_variables(value)
+            
         elif isinstance(value, dict):
-            return {k: self._resolve_variables(v) for k, v in value.items()}
+            items = [(k, *self._compile_template(v)) for k, v in value.items()]
+            if all(is_static for _, is_static, _ in items):
+                value = {k: render() for k, _, render in items}
+            else:
+                renders = [(k, render) for k, _, render in items]
+                return False, lambda: {k: render() for k, render in renders}
             
         elif isinstance(value, list):
-            return [self._resolve_variables(item) for item in value]
+            items = [self._compile_template(item) for item in value]
+            if all(is_static for is_static, _ in items):
+                value = [render() for _, render in items]
+            else:
+                renders = [render for _, render in items]
+                return False, lambda: [render() for render in renders]
             
-        return value
+        return True, lambda: value
     
-    def _generate_request_data(self, endpoint_config: Dict[str, Any]) -> Dict:
-        """Generate request data with resolved variables."""
+    def _compile_request_data(self, endpoint_config: Dict[str, Any]) -> Tuple[bool, Callable[[], Any]]:
+        """Compile the request data template of an endpoint into an (is_static, render) pair."""
         if 'data' not in endpoint_config:
-            return {}
+            return True, lambda: {}
         
         data = endpoint_config['data']
         if isinstance(data, str) and data.startswith('@'):
-            # Load data from file
+            # Load data from file, parsing it only once per file version
             file_path = data[1:]
-            with open(file_path, 'r') as f:
-                if file_path.endswith('.json'):
-                    data = json.load(f)
-                else:
-                    data = f.read()
+            data = _load_payload_file(file_path, os.stat(file_path).st_mtime)
         
-        return self._resolve_variables(data)
+        return self._compile_template(data)
     
-    def _generate_url(self, base_url: str, path: str) -> str:
-        """Generate full URL from base URL and path."""
-        return f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+    def _generate_url(self, path: str) -> str:
+        """Generate full URL from the configured base URL and path."""
+        return self._base + path.lstrip('/')
     
-    def _send_request(self, method: str, url: str, **kwargs) -> TestResult:
-        """Send a single HTTP request and return the result."""
-        start_time = time.perf_counter()
+    async def _send_request(self, request: httpx.Request) -> Tuple[bool, Optional[int], int, Optional[str]]:
+        """Send a single prepared HTTP request and return (success, status_code, response_time_ns, error)."""
+        start_time = time.perf_counter_ns()
         try:
-            response = self.session.request(method, url, **kwargs)
-            response_time = (time.perf_counter() - start_time) * 1000  # Convert to ms
+            response = await self.client.send(request, stream=True)
+            try:
+                # Only the status is checked, so drain the body without
+                # decoding or buffering it; reading it to the end keeps the
+                # connection reusable
+                async for _ in response.aiter_raw():
+                    pass
+            finally:
+                await response.aclose()
+            response_time = time.perf_counter_ns() - start_time
             response.raise_for_status()
-            return TestResult(
-                endpoint=url,
-                method=method,
-                success=True,
-                status_code=response.status_code,
-                response_time=response_time
-            )
-        except requests.exceptions.RequestException as e:
-            response_time = (time.perf_counter() - start_time) * 1000
-            status_code = e.response.status_code if hasattr(e, 'response') and e.response else None
-            return TestResult(
-                endpoint=url,
-                method=method,
-                success=False,
-                status_code=status_code,
-                response_time=response_time,
-                error=str(e),
-                request_data=kwargs.get('json', kwargs.get('data'))
-            )
+            return True, response.status_code, response_time, None
+        except httpx.HTTPError as e:
+            response_time = time.perf_counter_ns() - start_time
+            response = getattr(e, 'response', None)
+            status_code = response.status_code if response is not None else None
+            return False, status_code, response_time, str(e)
     
-    def test_endpoint(self, endpoint_config: Dict[str, Any]) -> List[TestResult]:
-        """Test a single endpoint according to its configuration."""
-        results = []
-        method = endpoint_config.get('method', 'GET').upper()
-        url = self._generate_url(self.config.base_url, endpoint_config['path'])
-        
-        # Generate request data
-        request_data = self._generate_request_data(endpoint_config)
+    def _prepare_endpoint(self, endpoint_config: Dict[str, Any]) -> EndpointRun:
+        """Set up the request builder and result arrays of an endpoint for a run."""
+        plan = self._endpoint_plans[id(endpoint_config)]
+        if isinstance(plan, Exception):
+            raise plan
+        method, url, is_static, render_data = plan
+        num_requests = self.config.requests_per_endpoint
+        has_body = method in ['POST', 'PUT', 'PATCH']
+        json_content = endpoint_config.get('json_content', True)
+        # Like json= in requests, only set the JSON Content-Type when the
+        # default headers do not already carry one
+        json_headers = None if 'content-type' in self.client.headers else {'Content-Type': 'application/json'}
         
-        # Set up request kwargs
-        kwargs = {}
-        if method in ['POST', 'PUT', 'PATCH'] and request_data:
-            kwargs['json' if endpoint_config.get('json_content', True) else 'data'] = request_data
+        def request_kwargs(request_data: Any) -> Dict[str, Any]:
+            kwargs = {}
+            if has_body and request_data:
+                if json_content:
+                    kwargs['content'] = _dump_json(request_data)
+                    if json_headers is not None:
+                        kwargs['headers'] = json_headers
+                elif isinstance(request_data, (str, bytes)):
+                    kwargs['content'] = request_data  # Raw body loaded from a file
+                else:
+                    kwargs['data'] = request_data
+            return kwargs
         
-        # Send requests
-        for _ in range(self.config.requests_per_endpoint):
-            result = self._send_request(method, url, **kwargs)
-            results.append(result)
+        # Bind the per-run constant arguments once rather than passing and
+        # looking them up again for every request
+        if is_static:
+            # Data without dynamic values is the same for every request, so
+            # render and serialize it once for the whole run
+            static_data = render_data()
+            new_request = functools.partial(self.client.build_request, method, url, **request_kwargs(static_data))
+            
+            def build_request() -> Tuple[httpx.Request, Any]:
+                return new_request(), static_data
+        else:
+            new_request = functools.partial(self.client.build_request, method, url)
             
-            # Add delay between requests if specified
-            if 'delay' in endpoint_config:
-                time.sleep(endpoint_config.get('delay', 0) / 1000)  # Convert ms to seconds
+            def build_request() -> Tuple[httpx.Request, Any]:
+                # Generate fresh request data for every request
+                request_data = render_data()
+                return new_request(**request_kwargs(request_data)), request_data
+        
+        return EndpointRun(
+            method=method,
+            url=url,
+            build_request=build_request,
+            times=np.zeros(num_requests, dtype=np.int64),
+            ok=np.zeros(num_requests, dtype=bool)
+        )
+    
+    async def _send_to(self, run: EndpointRun, i: int) -> None:
+        """Build and send the i-th request of an endpoint and record its result."""
+        request, request_data = run.build_request()
+        run.record(i, await self._send_request(request), request_data)
+    
+    async def _run_worker(self, pending: Iterator[Tuple[EndpointRun, int]]) -> List[Exception]:
+        """Send requests taken from the shared queue until it is empty and return the errors raised."""
+        # A worker (virtual user) takes its next request only once the previous
+        # one has finished, so requests are built lazily and waiting for a turn
+        # is never measured as latency
+        errors = []
+        for run, i in pending:
+            try:
+                await self._send_to(run, i)
+            except Exception as e:
+                errors.append(e)
+        return errors
+    
+    async def _run_paced(self, run: EndpointRun, delay: float) -> List[Exception]:
+        """Fire an endpoint's requests `delay` seconds apart and return the errors raised."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        in_flight = set()
+        errors = []
+        
+        def finished(task: asyncio.Task) -> None:
+            in_flight.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                errors.append(task.exception())
+        
+        for i in range(self.config.requests_per_endpoint):
+            if i:
+                await asyncio.sleep(max(0.0, start + i * delay - loop.time()))
+            # Launch without waiting for earlier responses, so a slow response
+            # does not delay the requests scheduled after it; only sends still
+            # in flight are kept
+            task = asyncio.ensure_future(self._send_to(run, i))
+            in_flight.add(task)
+            task.add_done_callback(finished)
+        
+        if in_flight:
+            await asyncio.wait(set(in_flight))
+        return errors
+    
+    async def _run_all(self, endpoints: List[Dict[str, Any]], num_workers: int) -> List[Any]:
+        """Test the given endpoints and return an EndpointRun, or the preparation error, per endpoint."""
+        # Created on first use so it binds to the tester's event loop
+        if self.client is None:
+            self.client = self._create_client()
+        
+        runs = []
+        paced = []
+        unpaced = []
+        for endpoint in endpoints:
+            try:
+                run = self._prepare_endpoint(endpoint)
+            except Exception as e:
+                runs.append(e)
+                continue
+            runs.append(run)
+            delay = endpoint.get('delay', 0) / 1000  # Convert ms to seconds
+            if delay:
+                paced.append(self._run_paced(run, delay))
+            else:
+                unpaced.append(run)
+        
+        # num_workers workers share a lazy queue holding request i of every
+        # endpoint before request i + 1 of any, so all endpoints progress
+        # together and a slow one does not hold back the rest. Paced endpoints
+        # keep their own schedule instead of waiting behind this queue
+        pending = ((run, i) for i in range(self.config.requests_per_endpoint) for run in unpaced)
+        workers = [self._run_worker(pending) for _ in range(num_workers)]
+        results = await asyncio.gather(*paced, *workers, return_exceptions=True)
+        
+        # Report each distinct error once rather than once per request
+        errors = [e for result in results for e in (result if isinstance(result, list) else [result])]
+        for error in dict.fromkeys(str(e) for e in errors):
+            print(f"Error in test execution: {error}")
+        return runs
+    
+    def run_endpoints(self, endpoint_indices: List[int], num_workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, List[TestResult]]:
+        """Test the endpoints at the given indices and return response times (ns), success flags and failures."""
+        endpoints = [self.config.endpoints[i] for i in endpoint_indices]
+        all_times = []
+        all_ok = []
+        failed = []
+        
+        # Collect results per endpoint, reporting endpoints that failed outright
+        for run in self._loop.run_until_complete(self._run_all(endpoints, num_workers or self.config.num_workers)):
+            if isinstance(run, Exception):
+                print(f"Error in test execution: {str(run)}")
+            else:
+                all_times.append(run.times)
+                all_ok.append(run.ok)
+                failed.extend(run.failures)
         
-        return results
+        times = np.concatenate(all_times) if all_times else np.empty(0, dtype=np.int64)
+        ok = np.concatenate(all_ok) if all_ok else np.empty(0, dtype=bool)
+        return times, ok, failed
     
     def run_tests(self) -> Dict[str, Any]:
         """Run all configured tests and return results."""
-        all_results = []
-        
-        with ThreadPoolExecutor(max_workers=self.config.num_workers) as executor:
-            futures = []
-            
-            # Submit all test cases
-            for endpoint in self.config.endpoints:
-                futures.append(executor.submit(self.test_endpoint, endpoint))
-            
-            # Collect results as they complete
-            for future in as_completed(futures):
-                try:
-                    results = future.result()
-                    all_results.extend(results)
-                except Exception as e:
-                    print(f"Error in test execution: {str(e)}")
+        num_endpoints = len(self.config.endpoints)
+        if self._executor is not None:
+            # Shard endpoints round-robin and give each shard its share of the
+            # workers, spreading the remainder so the total stays num_workers;
+            # only arrays and failures are sent back
+            num_shards = self._num_shards
+            shards = [list(range(i, num_endpoints, num_shards)) for i in range(num_shards)]
+            share, extra = divmod(self.config.num_workers, num_shards)
+            shard_workers = [share + (i < extra) for i in range(num_shards)]
+            results = list(self._executor.map(_run_shard, shards, shard_workers))
+        else:
+            results = [self.run_endpoints(list(range(num_endpoints)))]
         
         # Calculate statistics
-        successful = [r for r in all_results if r.success]
-        failed = [r for r in all_results if not r.success]
-        response_times = [r.response_time for r in successful]
+        times = np.concatenate([times for times, _, _ in results]) if results else np.empty(0, dtype=np.int64)
+        ok = np.concatenate([ok for _, ok, _ in results]) if results else np.empty(0, dtype=bool)
+        failed = [failure for _, _, failures in results for failure in failures]
+        
+        # Only the fixed-size summary outlives the run, not the individual times
+        latency = RunningStats()
+        latency.add_many(times[ok])
         
         return {
-            'total_requests': len(all_results),
-            'successful_requests': len(successful),
-            'failed_requests': len(failed),
-            'min_time': min(response_times) if response_times else 0,
-            'max_time': max(response_times) if response_times else 0,
-            'avg_time': sum(response_times) / len(response_times) if response_times else 0,
-            'response_times': response_times,
-            'errors': [{'endpoint': r.endpoint, 'error': r.error} for r in failed]
+            'total_requests': int(times.size),
+            'successful_requests': latency.count,
+            'failed_requests': int(times.size) - latency.count,
+            **latency.summary(),
+            'latency': latency,
+            'errors': [{'endpoint': r.endpoint, 'status_code': r.status_code, 'error': r.error} for r in failed]
         }
 
-def generate_html_report(stats: Dict, output_dir: str = 'reports', is_aggregated: bool = False) -> str:
-    """Generate an HTML report from test statistics."""
-    os.makedirs(output_dir, exist_ok=True)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    report_path = os.path.join(output_dir, f'performance_report_{timestamp}.html')
-    
-    # Calculate success rate safely
-    total_requests = stats.get('total_requests', 0)
-    successful_requests = stats.get('successful_requests', 0)
-    failed_requests = stats.get('failed_requests', 0)
-    
-    # Handle cases where there are no successful requests
-    has_successful = successful_requests > 0
-    
-    html = """
+# Tester owned by each worker process when endpoints are sharded across processes
+_worker_tester: Optional[PerformanceTester] = None
+
+def _init_worker(config_path: str) -> None:
+    """Create the worker process's own tester."""
+    global _worker_tester
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    _worker_tester = PerformanceTester(config_path, num_processes=1)
+
+def _run_shard(endpoint_indices: List[int], num_workers: int) -> Tuple[np.ndarray, np.ndarray, List[TestResult]]:
+    """Test a shard of the endpoints in a worker process with its share of the workers."""
+    return _worker_tester.run_endpoints(endpoint_indices, num_workers)
+
+# The report skeleton is parsed once at import
+REPORT_HEAD_TEMPLATE = string.Template("""
     <!DOCTYPE html>
     <html>
     <head>
         <title>Performance Test Report</title>
         <style>
-            body {{ font-family: Arial, sans-serif; margin: 20px; }}
-            .summary {{ background: #f5f5f5; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-            .metric {{ margin: 10px 0; }}
-            .success {{ color: green; }}
-            .error {{ color: red; }}
-            .warning {{ color: orange; font-weight: bold; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-            th {{ background-color: #f2f2f2; }}
-            tr:nth-child(even) {{ background-color: #f9f9f9; }}
-            pre {{ background: #f5f5f5; padding: 10px; border-radius: 4px; overflow-x: auto; }}
+            body { font-family: Arial, sans-serif; margin: 20px; }
+            .summary { background: #f5f5f5; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+            .metric { margin: 10px 0; }
+            .success { color: green; }
+            .error { color: red; }
+            .warning { color: orange; font-weight: bold; }
+            table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+            th { background-color: #f2f2f2; }
+            tr:nth-child(even) { background-color: #f9f9f9; }
+            pre { background: #f5f5f5; padding: 10px; border-radius: 4px; overflow-x: auto; }
         </style>
     </head>
     <body>
         <h1>Performance Test Report</h1>
         <div class="summary">
             <h2>Summary</h2>
-            <div class="metric">Total Requests: {total_requests}</div>
-            <div class="metric {success_class}">Successful: {successful_requests}</div>
-            <div class="metric {error_class}">Failed: {failed_requests}</div>
-            <div class="metric">Success Rate: {success_rate:.2f}%</div>
-    """.format(
-        total_requests=total_requests,
-        successful_requests=successful_requests,
-        failed_requests=failed_requests,
-        success_rate=(successful_requests / total_requests * 100) if total_requests > 0 else 0,
-        success_class="success" if successful_requests > 0 else "error",
-        error_class="error" if failed_requests > 0 else ""
-    )
-    
-    # Add response time metrics only if there were successful requests
-    if has_successful:
-        html += f"""
-            <div class="metric">Average Response Time: {stats.get('avg_time', 0):.2f} ms</div>
-            <div class="metric">Min Response Time: {stats.get('min_time', 0):.2f} ms</div>
-            <div class="metric">Max Response Time: {stats.get('max_time', 0):.2f} ms</div>
-        """
-        
-        # Add individual run stats if this is an aggregated report
-        if is_aggregated and 'individual_runs' in stats:
-            html += """
-                <div class="metric">
-                    <h3>Individual Run Statistics</h3>
-                    <table>
-                        <tr>
-                            <th>Run #</th>
-                            <th>Success Rate</th>
-                            <th>Avg Response Time (ms)</th>
-                        </tr>
-            """
-            
-            for run in stats['individual_runs']:
-                html += f"""
+            <div class="metric">Total Requests: $total_requests</div>
+            <div class="metric $success_class">Successful: $successful_requests</div>
+            <div class="metric $error_class">Failed: $failed_requests</div>
+            <div class="metric">Success Rate: $success_rate%</div>
+    """)
+REPORT_METRICS_TEMPLATE = string.Template("""
+            <div class="metric">Average Response Time: $avg_time ms</div>
+            <div class="metric">Min Response Time: $min_time ms</div>
+            <div class="metric">Max Response Time: $max_time ms</div>
+            <div class="metric">Percentiles (p50 / p95 / p99): $p50_time / $p95_time / $p99_time ms</div>
+        """)
+
+# Row templates for the HTML report tables
+RUN_ROW_TEMPLATE = """
                     <tr>
-                        <td>{run['run']}</td>
-                        <td>{run['success_rate']:.2f}%</td>
-                        <td>{run['avg_time']:.2f}</td>
+                        <td>{}</td>
+                        <td>{:.2f}%</td>
+                        <td>{:.2f}</td>
                     </tr>
                 """
-            
-            html += """
-                    </table>
-                </div>
-            """
-    else:
-        html += """
-            <div class="metric warning">No successful requests to calculate response times</div>
-        """
-    
-    html += "</div>"  # Close summary div
-    
-    # Add errors section if any
-    errors = stats.get('errors', []) if not is_aggregated else (stats.get('all_errors', [])[:50])  # Limit to 50 errors in aggregated report
-    if errors:
-        html += "<h2>Error Details</h2>"
-        html += "<p>First few errors encountered:</p>"
-        html += "<table><tr><th>#</th><th>Endpoint</th><th>Status Code</th><th>Error</th></tr>"
-        for i, error in enumerate(errors[:10], 1):  # Show first 10 errors
-            status_code = error.get('status_code', 'N/A')
-            endpoint = error.get('endpoint', 'Unknown')
-            error_msg = error.get('error', 'No error details available')
-            
-            # Truncate long error messages
-            if len(str(error_msg)) > 100:
-                error_msg = str(error_msg)[:100] + '...'
-                
-            html += f"""
+ERROR_ROW_TEMPLATE = """
             <tr>
-                <td>{i}</td>
-                <td>{endpoint}</td>
-                <td>{status_code}</td>
-                <td><pre>{error_msg}</pre></td>
+                <td>{}</td>
+                <td>{}</td>
+                <td>{}</td>
+                <td><pre>{}</pre></td>
             </tr>"""
+
+def generate_html_report(stats: Dict, output_dir: str = 'reports', is_aggregated: bool = False) -> str:
+    """Generate an HTML report from test statistics in an existing output directory."""
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    report_path = os.path.join(output_dir, f'performance_report_{timestamp}.html')
+    
+    # Calculate success rate safely
+    total_requests = stats.get('total_requests', 0)
+    successful_requests = stats.get('successful_requests', 0)
+    failed_requests = stats.get('failed_requests', 0)
+    
+    # Handle cases where there are no successful requests
+    has_successful = successful_requests > 0
+    
+    # Stream the report straight into a large write buffer rather than
+    # materializing the whole document as one string; chunks are encoded
+    # here and written in binary mode, bypassing the text layer
+    with open(report_path, 'wb', buffering=1 << 20) as f:
+        write = f.write
+        
+        def w(chunk: str) -> None:
+            write(chunk.encode('utf-8'))
         
-        if len(errors) > 10:
-            html += f"<tr><td colspan='4'>... and {len(errors) - 10} more errors (showing first 10)</td></tr>"
+        w(REPORT_HEAD_TEMPLATE.substitute(
+            total_requests=total_requests,
+            successful_requests=successful_requests,
+            failed_requests=failed_requests,
+            success_rate=f"{(successful_requests / total_requests * 100) if total_requests > 0 else 0:.2f}",
+            success_class="success" if successful_requests > 0 else "error",
+            error_class="error" if failed_requests > 0 else ""
+        ))
+        
+        # Add response time metrics only if there were successful requests
+        if has_successful:
+            w(REPORT_METRICS_TEMPLATE.substitute(
+                {key: f"{stats.get(key, 0):.2f}" for key in ('avg_time', 'min_time', 'max_time', 'p50_time', 'p95_time', 'p99_time')}
+            ))
             
-        html += "</table>"
-        
-        # Add debugging tips if all requests failed
-        if successful_requests == 0 and total_requests > 0 and not is_aggregated:
-            html += """
-            <div style="margin-top: 20px; padding: 15px; background-color: #fff3cd; border-left: 5px solid #ffc107;">
-                <h3>Debugging Tips</h3>
-                <ul>
-                    <li>Check if the API server is running and accessible</li>
-                    <li>Verify the base URL in the configuration</li>
-                    <li>Check if authentication is required and credentials are correct</li>
-                    <li>Inspect the error messages above for more details</li>
-                    <li>Try testing the endpoints manually with a tool like curl or Postman</li>
-                </ul>
-            </div>
-            """
-    
-    html += "</body></html>"
-    
-    with open(report_path, 'w') as f:
-        f.write(html)
+            # Add individual run stats if this is an aggregated report
+            if is_aggregated and 'individual_runs' in stats:
+                w("""
+                    <div class="metric">
+                        <h3>Individual Run Statistics</h3>
+                        <table>
+                            <tr>
+                                <th>Run #</th>
+                                <th>Success Rate</th>
+                                <th>Avg Response Time (ms)</th>
+                            </tr>
+                """)
+                
+                w(''.join(RUN_ROW_TEMPLATE.format(run['run'], run['success_rate'], run['avg_time'])
+                          for run in stats['individual_runs']))
+                
+                w("""
+                        </table>
+                    </div>
+                """)
+        else:
+            w("""
+                <div class="metric warning">No successful requests to calculate response times</div>
+            """)
+        
+        w("</div>")  # Close summary div
+        
+        # Add errors section if any
+        errors = stats.get('errors', []) if not is_aggregated else (stats.get('all_errors', [])[:50])  # Limit to 50 errors in aggregated report
+        if errors:
+            w("<h2>Error Details</h2>")
+            w("<p>First few errors encountered:</p>")
+            w("<table><tr><th>#</th><th>Endpoint</th><th>Status Code</th><th>Error</th></tr>")
+            for i, error in enumerate(errors[:10], 1):  # Show first 10 errors
+                status_code = error.get('status_code') or 'N/A'  # None for transport errors
+                endpoint = error.get('endpoint', 'Unknown')
+                error_msg = error.get('error', 'No error details available')  # Already truncated and escaped
+                
+                # Endpoints come from configs, so escape them
+                w(ERROR_ROW_TEMPLATE.format(i, html.escape(str(endpoint), quote=False), status_code, error_msg))
+            
+            if len(errors) > 10:
+                w(f"<tr><td colspan='4'>... and {len(errors) - 10} more errors (showing first 10)</td></tr>")
+                
+            w("</table>")
+            
+            # Add debugging tips if all requests failed
+            if successful_requests == 0 and total_requests > 0 and not is_aggregated:
+                w("""
+                <div style="margin-top: 20px; padding: 15px; background-color: #fff3cd; border-left: 5px solid #ffc107;">
+                    <h3>Debugging Tips</h3>
+                    <ul>
+                        <li>Check if the API server is running and accessible</li>
+                        <li>Verify the base URL in the configuration</li>
+                        <li>Check if authentication is required and credentials are correct</li>
+                        <li>Inspect the error messages above for more details</li>
+                        <li>Try testing the endpoints manually with a tool like curl or Postman</li>
+                    </ul>
+                </div>
+                """)
+        
+        w("</body></html>")
     
     return report_path
 
@@ -419,19 +791,19 @@ def aggregate_results(all_stats: List[Dict]) -> Dict:
         'total_requests': 0,
         'successful_requests': 0,
         'failed_requests': 0,
-        'response_times': [],
         'all_errors': [],
         'run_stats': []
     }
     
     # Aggregate data from all runs
+    latency = RunningStats()
     for stats in all_stats:
         aggregated['total_requests'] += stats.get('total_requests', 0)
         aggregated['successful_requests'] += stats.get('successful_requests', 0)
         aggregated['failed_requests'] += stats.get('failed_requests', 0)
         
-        if 'response_times' in stats and stats['response_times']:
-            aggregated['response_times'].extend(stats['response_times'])
+        if 'latency' in stats:
+            latency.merge(stats['latency'])
         
         if 'errors' in stats:
             aggregated['all_errors'].extend(stats['errors'])
@@ -445,14 +817,8 @@ def aggregate_results(all_stats: List[Dict]) -> Dict:
         })
     
     # Calculate aggregated metrics
-    if aggregated['response_times']:
-        aggregated['avg_time'] = sum(aggregated['response_times']) / len(aggregated['response_times'])
-        aggregated['min_time'] = min(aggregated['response_times'])
-        aggregated['max_time'] = max(aggregated['response_times'])
-    else:
-        aggregated['avg_time'] = 0
-        aggregated['min_time'] = 0
-        aggregated['max_time'] = 0
+    aggregated['latency'] = latency
+    aggregated.update(latency.summary())
     
     # Calculate success rate across all runs
     if aggregated['total_requests'] > 0:
@@ -471,25 +837,38 @@ def main():
     
     args = parser.parse_args()
     
+    # The event loop sits on the hot path of every request, so use the faster one if installed
+    if UVLOOP_AVAILABLE:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     try:
+        # Create the report directory up front so an unwritable path fails before the tests run
+        os.makedirs(args.output, exist_ok=True)
+        
         tester = PerformanceTester(args.config)
         print(f"Running performance tests with {tester.config.num_workers} workers...")
         
         all_stats = []
         
-        # Run tests multiple times if specified
-        for run in range(1, tester.config.num_test_runs + 1):
-            print(f"\n--- Test Run {run}/{tester.config.num_test_runs} ---")
-            stats = tester.run_tests()
-            all_stats.append(stats)
-            
-            # Print summary for this run
-            print(f"\nTest Run {run} Summary:")
-            print(f"  Total Requests: {stats['total_requests']}")
-            print(f"  Successful: {stats['successful_requests']}")
-            print(f"  Failed: {stats['failed_requests']}")
-            print(f"  Success Rate: {(stats['successful_requests'] / stats['total_requests'] * 100):.2f}%")
-            print(f"  Avg Response Time: {stats.get('avg_time', 0):.2f} ms")
+        # Always release the client, event loop and worker processes, even
+        # when a run fails
+        try:
+            # Run tests multiple times if specified
+            for run in range(1, tester.config.num_test_runs + 1):
+                print(f"\n--- Test Run {run}/{tester.config.num_test_runs} ---")
+                stats = tester.run_tests()
+                all_stats.append(stats)
+                
+                # Print summary for this run
+                print(f"\nTest Run {run} Summary:")
+                print(f"  Total Requests: {stats['total_requests']}")
+                print(f"  Successful: {stats['successful_requests']}")
+                print(f"  Failed: {stats['failed_requests']}")
+                print(f"  Success Rate: {(stats['successful_requests'] / stats['total_requests'] * 100):.2f}%")
+                print(f"  Avg Response Time: {stats.get('avg_time', 0):.2f} ms")
+                print(f"  p95 Response Time: {stats.get('p95_time', 0):.2f} ms")
+        finally:
+            tester.close()
         
         # Generate a single comprehensive report for all runs
         if all_stats: